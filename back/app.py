@@ -7,9 +7,10 @@ from datetime import datetime
 
 from data.chat import Chat
 from data.storage import create_tables
+from data.vector_index import create_vector_index
 from rag import RAGProcessor
 from llm import llm
-from template_manager import TemplateManager
+from template_manager import template_manager
 
 create_tables()
 
@@ -33,8 +34,7 @@ class MessageResponse(BaseModel):
     timestamp: str
 
 chat = Chat()
-template_manager = TemplateManager()
-rag_processor = RAGProcessor(llm, template_manager)
+rag_processor = RAGProcessor(llm, template_manager, create_vector_index())
 
 def process_rag_background():
     rag_response = rag_processor.process(chat)
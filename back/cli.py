@@ -2,16 +2,36 @@
 
 import sys
 import os
+import json
+import contextlib
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 from pathlib import Path
 from main import file_processor_factory
-from data.storage import DataChunk, repopulate_data_chunks, create_tables
-from data.chunking import chunk_text
+from config import config
+from data.storage import (
+    DataChunk, SessionLocal, repopulate_data_chunks, create_tables, migrate_embedding_storage,
+    search_data_chunks, exact_search_data_chunks, sample_embeddings
+)
+from data.vector_index import create_vector_index, write_vector_index_snapshot
+from data.chunking import chunk_stream
 from llm import llm
-from template_manager import TemplateManager
+from template_manager import template_manager
 from rag import RAGProcessor
 
 create_tables()
 
+INGEST_BATCH_SIZE = 256
+PREVIEW_CHUNKS = 3
+
+def flush_data_chunks(data_chunks):
+    if not data_chunks:
+        return
+    print(f"  Storing {len(data_chunks)} data chunks...")
+    repopulate_data_chunks(data_chunks)
+    data_chunks.clear()
+
 def ingest_command(data_directory):
     """Handle the ingest command."""
     if not data_directory.is_dir():
@@ -25,8 +45,8 @@ def ingest_command(data_directory):
         return
     
     total_files = len(files)
-    total_items = 0
-    all_data_chunks = []
+    total_chunks = 0
+    pending_data_chunks = []
     
     for i, file_path in enumerate(files, 1):
         print(f"\n[{i}/{total_files}] Processing: {file_path.name}")
@@ -37,74 +57,204 @@ def ingest_command(data_directory):
             print(f"  Skipping unsupported file type: {e}")
             continue
         
+        file_chunk_count = 0
         with open(file_path, 'rb') as f:
-            results = processor.process_file(f)
-        
-        item_count = len(results)
-        total_items += item_count
-        
-        print(f"  ✓ Extracted {item_count} items")
-        
-        global_chunk_index = 0
-        for item_index, item_text in enumerate(results):
-            text_chunks = chunk_text(item_text, max_tokens=400, overlap_tokens=40)
-            
-            for chunk_index, chunk_content in enumerate(text_chunks):
-                embedding = llm.generate_embedding(chunk_content)
+            for chunk_content in chunk_stream(processor.iter_process(f), max_tokens=400, overlap_tokens=40):
+                if file_chunk_count < PREVIEW_CHUNKS:
+                    preview = chunk_content[:100] + '...' if len(chunk_content) > 100 else chunk_content
+                    print(f"    {file_chunk_count + 1}: {preview}")
                 
-                data_chunk = DataChunk(
+                pending_data_chunks.append(DataChunk(
                     filename=file_path.name,
-                    chunk_index=global_chunk_index,
+                    chunk_index=file_chunk_count,
                     chunk_text=chunk_content,
-                    embedding=embedding
-                )
-                all_data_chunks.append(data_chunk)
-                global_chunk_index += 1
+                    embedding=llm.generate_embedding(chunk_content)
+                ))
+                file_chunk_count += 1
+                
+                if len(pending_data_chunks) >= INGEST_BATCH_SIZE:
+                    flush_data_chunks(pending_data_chunks)
         
-        if results:
-            print(f"  Preview:")
-            for j, item in enumerate(results[:3]):
-                preview = item[:100] + '...' if len(item) > 100 else item
-                print(f"    {j+1}: {preview}")
-            if len(results) > 3:
-                print(f"    ... and {len(results) - 3} more items")
+        total_chunks += file_chunk_count
+        print(f"  ✓ Extracted {file_chunk_count} chunks")
+    
+    flush_data_chunks(pending_data_chunks)
     
     print("\n" + "=" * 50)
     print(f"SUMMARY:")
     print(f"  Total files processed: {total_files}")
-    print(f"  Total items extracted: {total_items}")
-    print(f"  Total data chunks created: {len(all_data_chunks)}")
-    print(f"  Average items per file: {total_items / total_files:.1f}")
-    print(f"  Average chunks per item: {len(all_data_chunks) / total_items:.1f}" if total_items > 0 else "  Average chunks per item: 0")
-    
-    if all_data_chunks:
-        print(f"\nRepopulating database with {len(all_data_chunks)} data chunks...")
-        repopulate_data_chunks(all_data_chunks)
+    print(f"  Total data chunks created: {total_chunks}")
+    print(f"  Average chunks per file: {total_chunks / total_files:.1f}")
+    
+    if total_chunks:
         print("✓ Database successfully updated with data chunks")
     else:
         print("No data chunks to store in database")
+    
+    if config.VECTOR_INDEX == 'numpy':
+        snapshot_rows = write_vector_index_snapshot()
+        print(f"✓ Vector index snapshot written with {snapshot_rows} chunks")
 
 def ask_command(prompt):
     """Handle the ask command."""
-    template_manager = TemplateManager()
-    rag_processor = RAGProcessor(llm, template_manager)
+    rag_processor = RAGProcessor(llm, template_manager, create_vector_index())
     
     print(f"Question: {prompt}")
     print("=" * 60)
     
-    answer = rag_processor.process(prompt)
+    answer = rag_processor.ask(prompt)
     
     print("Answer:")
     print("-" * 40)
     print(answer)
     print("=" * 60)
 
+def parse_question_line(line):
+    try:
+        item = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {'input': line.rstrip('\n')}, f'Invalid JSON: {e}'
+    if not isinstance(item, dict):
+        return {'input': item}, 'Expected a JSON object'
+    if not isinstance(item.get('question'), str):
+        return item, 'Missing "question"'
+    return item, None
+
+def read_question_batches(input_file, batch_size):
+    questions = (parse_question_line(line) for line in input_file if line.strip())
+    while True:
+        batch = list(islice(questions, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def write_answer(output, record):
+    output.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+def answer_batch_question(rag_processor, item, chunks, batch_timings):
+    started = time.perf_counter()
+    try:
+        answer = rag_processor.answer(item['question'], chunks)
+    except Exception as e:
+        return {**item, 'error': str(e)}
+    completion_ms = (time.perf_counter() - started) * 1000
+    
+    return {
+        **item,
+        'answer': answer,
+        'sources': [{'filename': chunk.filename, 'chunk_index': chunk.chunk_index} for chunk in chunks],
+        'timings': {**batch_timings, 'completion_ms': round(completion_ms, 2)},
+    }
+
+def write_completed_answers(pending, output, max_pending):
+    while len(pending) > max_pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            write_answer(output, future.result())
+        output.flush()
+    return pending
+
+def ask_batch_command(input_path, output_path=None):
+    """Handle the ask-batch command."""
+    if not input_path.is_file():
+        print(f"Error: File not found: {input_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    rag_processor = RAGProcessor(llm, template_manager, create_vector_index())
+    max_pending = config.ASK_BATCH_CONCURRENCY * 2
+    pending = set()
+    
+    with open(input_path, 'r', encoding='utf-8') as input_file, \
+            (open(output_path, 'w', encoding='utf-8') if output_path else contextlib.nullcontext(sys.stdout)) as output, \
+            ThreadPoolExecutor(max_workers=config.ASK_BATCH_CONCURRENCY) as executor:
+        for batch in read_question_batches(input_file, config.ASK_BATCH_SIZE):
+            for item, error in batch:
+                if error:
+                    write_answer(output, {**item, 'error': error})
+            batch = [item for item, error in batch if not error]
+            if not batch:
+                continue
+            
+            started = time.perf_counter()
+            try:
+                embeddings = llm.generate_embeddings([item['question'] for item in batch])
+                embedded = time.perf_counter()
+                chunks_batch = rag_processor.get_relevant_chunks_batch(embeddings, limit=5)
+                retrieved = time.perf_counter()
+            except Exception as e:
+                for item in batch:
+                    write_answer(output, {**item, 'error': str(e)})
+                continue
+            
+            batch_timings = {
+                'batch_size': len(batch),
+                'batch_embedding_ms': round((embedded - started) * 1000, 2),
+                'batch_retrieval_ms': round((retrieved - embedded) * 1000, 2),
+            }
+            for item, chunks in zip(batch, chunks_batch):
+                pending.add(executor.submit(answer_batch_question, rag_processor, item, chunks, batch_timings))
+            
+            pending = write_completed_answers(pending, output, max_pending)
+        
+        write_completed_answers(pending, output, 0)
+
+def migrate_embeddings_command():
+    """Handle the migrate-embeddings command."""
+    print(f"Building '{config.EMBEDDING_STORAGE}' embedding index on data_chunks...")
+    migrate_embedding_storage()
+    print("✓ Embedding index rebuilt")
+
+def measure_search(db, queries, ground_truth, limit, rerank_factor):
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, ground_truth):
+        started = time.perf_counter()
+        chunks = search_data_chunks(db, query, limit, rerank_factor)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found = {(chunk.filename, chunk.chunk_index) for chunk in chunks}
+        recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+    
+    latencies.sort()
+    return {
+        'recall': sum(recalls) / len(recalls),
+        'p50': latencies[len(latencies) // 2],
+        'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+def embedding_report_command(query_count, limit):
+    """Handle the embedding-report command."""
+    db = SessionLocal()
+    queries = sample_embeddings(db, query_count)
+    if not queries:
+        print("No data chunks to measure")
+        db.close()
+        return
+    
+    ground_truth = [
+        {(chunk.filename, chunk.chunk_index) for chunk in exact_search_data_chunks(db, query, limit)}
+        for query in queries
+    ]
+    
+    rerank_factors = sorted({0, config.EMBEDDING_RERANK_FACTOR, config.EMBEDDING_RERANK_FACTOR * 2})
+    
+    print(f"Storage: {config.EMBEDDING_STORAGE}, queries: {len(queries)}, top-k: {limit}")
+    print("=" * 60)
+    print(f"{'rerank factor':>14} {'recall@k':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for rerank_factor in rerank_factors:
+        result = measure_search(db, queries, ground_truth, limit, rerank_factor)
+        print(f"{rerank_factor:>14} {result['recall']:>10.3f} {result['p50']:>10.2f} {result['p95']:>10.2f}")
+    
+    db.close()
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python cli.py <command> [args]")
         print("Commands:")
         print("  ingest <directory>  - Process files and populate database")
         print("  ask <prompt>         - Ask a question using RAG")
+        print("  ask-batch <questions.jsonl> [answers.jsonl] - Answer questions from a JSONL file")
+        print("  migrate-embeddings   - Build the embedding index for EMBEDDING_STORAGE")
+        print("  embedding-report [queries] [top_k] - Report recall versus latency")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -123,9 +273,24 @@ def main():
         prompt = ' '.join(sys.argv[2:])
         ask_command(prompt)
     
+    elif command == 'ask-batch':
+        if len(sys.argv) < 3:
+            print("Usage: python cli.py ask-batch <questions.jsonl> [answers.jsonl]")
+            sys.exit(1)
+        output_path = Path(sys.argv[3]) if len(sys.argv) > 3 else None
+        ask_batch_command(Path(sys.argv[2]), output_path)
+    
+    elif command == 'migrate-embeddings':
+        migrate_embeddings_command()
+    
+    elif command == 'embedding-report':
+        query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+        limit = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+        embedding_report_command(query_count, limit)
+    
     else:
         print(f"Unknown command: {command}")
-        print("Available commands: ingest, ask")
+        print("Available commands: ingest, ask, ask-batch, migrate-embeddings, embedding-report")
         sys.exit(1)
 
 if __name__ == '__main__':
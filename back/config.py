@@ -26,6 +26,41 @@ class Config:
     # OpenAI Configuration
     OPENAI_KEY: str = os.getenv('OPENAI_KEY', '')
     OPENAI_MODEL: str = os.getenv('OPENAI_MODEL', 'gpt-4')
+    OPENAI_BASE_URL: str = os.getenv('OPENAI_BASE_URL', '')
+    
+    # LLM Client Configuration
+    LLM_REQUESTS_PER_MINUTE: int = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '500'))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv('LLM_TOKENS_PER_MINUTE', '30000'))
+    EMBEDDING_REQUESTS_PER_MINUTE: int = int(os.getenv('EMBEDDING_REQUESTS_PER_MINUTE', '3000'))
+    EMBEDDING_TOKENS_PER_MINUTE: int = int(os.getenv('EMBEDDING_TOKENS_PER_MINUTE', '1000000'))
+    LLM_COMPLETION_TOKENS_ESTIMATE: int = int(os.getenv('LLM_COMPLETION_TOKENS_ESTIMATE', '500'))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv('LLM_TIMEOUT_SECONDS', '60'))
+    LLM_MAX_RETRIES: int = int(os.getenv('LLM_MAX_RETRIES', '6'))
+    LLM_BACKOFF_BASE_SECONDS: float = float(os.getenv('LLM_BACKOFF_BASE_SECONDS', '1'))
+    LLM_BACKOFF_MAX_SECONDS: float = float(os.getenv('LLM_BACKOFF_MAX_SECONDS', '60'))
+    
+    # Fake LLM Server Configuration
+    FAKE_LLM_PORT: int = int(os.getenv('FAKE_LLM_PORT', '8001'))
+    FAKE_LLM_FAILURE_RATE: float = float(os.getenv('FAKE_LLM_FAILURE_RATE', '0'))
+    FAKE_LLM_RETRY_AFTER_SECONDS: float = float(os.getenv('FAKE_LLM_RETRY_AFTER_SECONDS', '1'))
+    FAKE_LLM_LATENCY_SECONDS: float = float(os.getenv('FAKE_LLM_LATENCY_SECONDS', '0'))
+    
+    # Embedding Storage Configuration
+    EMBEDDING_STORAGE: str = os.getenv('EMBEDDING_STORAGE', 'vector')
+    EMBEDDING_RERANK: bool = os.getenv('EMBEDDING_RERANK', 'false').lower() == 'true'
+    EMBEDDING_RERANK_FACTOR: int = int(os.getenv('EMBEDDING_RERANK_FACTOR', '4'))
+    
+    # Vector Index Configuration (database or numpy)
+    VECTOR_INDEX: str = os.getenv('VECTOR_INDEX', 'database')
+    VECTOR_INDEX_PATH: str = os.getenv('VECTOR_INDEX_PATH', 'vector_index')
+    VECTOR_INDEX_REFRESH_SECONDS: float = float(os.getenv('VECTOR_INDEX_REFRESH_SECONDS', '30'))
+    
+    # Retrieval Configuration
+    RETRIEVAL_NEIGHBORS: int = int(os.getenv('RETRIEVAL_NEIGHBORS', '0'))
+    
+    # Batch Question Answering Configuration
+    ASK_BATCH_SIZE: int = int(os.getenv('ASK_BATCH_SIZE', '64'))
+    ASK_BATCH_CONCURRENCY: int = int(os.getenv('ASK_BATCH_CONCURRENCY', '8'))
     
     # Environment
     ENVIRONMENT: str = os.getenv('ENVIRONMENT', 'development')
@@ -1,4 +1,11 @@
+from typing import Iterable, Iterator
 from llm import llm
+from data.file_processor import DOCUMENT_BOUNDARY
+
+STREAM_CHARS_PER_TOKEN = 4
+STREAM_WINDOW_FLUSHES = 4
+SENTENCE_SEPARATOR = '. '
+FALLBACK_SEPARATORS = ('\n', ' ')
 
 def chunk_text(text: str, max_tokens: int = 400, overlap_tokens: int = 40) -> list:
     if not text.strip():
@@ -38,6 +45,82 @@ def chunk_text(text: str, max_tokens: int = 400, overlap_tokens: int = 40) -> li
     
     return chunks
 
+def fallback_cut(text: str, limit: int) -> int:
+    if len(text) <= limit:
+        return len(text)
+    for separator in FALLBACK_SEPARATORS:
+        cut = text.rfind(separator, limit // 2, limit)
+        if cut > 0:
+            return cut + 1
+    return limit
+
+def split_without_sentences(buffer: str, max_tokens: int, overlap_tokens: int, keep_chars: int):
+    chunk_chars = max_tokens * STREAM_CHARS_PER_TOKEN
+    chunks = []
+    while len(buffer) > keep_chars:
+        cut = fallback_cut(buffer, chunk_chars)
+        chunk, buffer = buffer[:cut].strip(), buffer[cut:]
+        if not chunk:
+            continue
+        chunks.append(chunk)
+        overlap_text = get_overlap_text(chunk, overlap_tokens) if overlap_tokens > 0 and buffer.strip() else ""
+        if overlap_text:
+            buffer = overlap_text + " " + buffer
+    return chunks, buffer
+
+def split_oversized(chunks: list, max_tokens: int, overlap_tokens: int) -> Iterator[str]:
+    max_chars = max_tokens * STREAM_CHARS_PER_TOKEN * 2
+    for chunk in chunks:
+        if len(chunk) > max_chars:
+            yield from split_without_sentences(chunk, max_tokens, overlap_tokens, 0)[0]
+        else:
+            yield chunk
+
+def chunk_buffer(buffer: str, max_tokens: int, overlap_tokens: int) -> Iterator[str]:
+    return split_oversized(chunk_text(buffer, max_tokens, overlap_tokens), max_tokens, overlap_tokens)
+
+def chunk_stream(pieces: Iterable[str], max_tokens: int = 400, overlap_tokens: int = 40) -> Iterator[str]:
+    flush_chars = max_tokens * STREAM_CHARS_PER_TOKEN * 2
+    window_chars = flush_chars * STREAM_WINDOW_FLUSHES
+    next_flush = flush_chars
+    buffer = ""
+    
+    for piece in pieces:
+        if piece == DOCUMENT_BOUNDARY:
+            yield from chunk_buffer(buffer, max_tokens, overlap_tokens)
+            buffer = ""
+            next_flush = flush_chars
+            continue
+        
+        buffer += piece
+        if len(buffer) < next_flush:
+            continue
+        
+        boundary = buffer.rfind(SENTENCE_SEPARATOR)
+        chunks = chunk_text(buffer[:boundary], max_tokens, overlap_tokens) if boundary > 0 else []
+        if len(chunks) >= 2:
+            yield from split_oversized(chunks[:-1], max_tokens, overlap_tokens)
+            buffer = chunks[-1] + buffer[boundary:]
+        elif len(buffer) < window_chars:
+            next_flush = min(len(buffer) * 2, window_chars)
+            continue
+        else:
+            chunks, buffer = split_without_sentences(buffer, max_tokens, overlap_tokens, flush_chars)
+            yield from chunks
+        next_flush = len(buffer) + flush_chars
+    
+    yield from chunk_buffer(buffer, max_tokens, overlap_tokens)
+
+def merge_chunk_texts(texts: list, max_overlap_words: int = 200) -> str:
+    merged_words = []
+    for chunk in texts:
+        words = chunk.split()
+        overlap = min(len(merged_words), len(words), max_overlap_words)
+        while overlap and merged_words[-overlap:] != words[:overlap]:
+            overlap -= 1
+        merged_words.extend(words[overlap:])
+    return " ".join(merged_words)
+
 def get_overlap_text(text: str, overlap_tokens: int) -> str:
     if not text.strip():
         return ""
@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Dict, Any, List
+from typing import BinaryIO, Dict, Any, Iterator, List
+from html.parser import HTMLParser
+import codecs
 import io
+import mmap
+import os
 import zipfile
 import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
+
+MMAP_THRESHOLD = 64 * 1024 * 1024
+DOCUMENT_BOUNDARY = '\x1c'
 
 class FileProcessor(ABC):
     def __init__(self, chunk_size: int = 8192, **kwargs):
@@ -18,6 +24,28 @@ class FileProcessor(ABC):
     @abstractmethod
     def process(self, obj) -> List[str]:
         pass
+    
+    def iter_process(self, file: BinaryIO) -> Iterator[str]:
+        for document in self.process_file(file):
+            yield document
+            yield DOCUMENT_BOUNDARY
+    
+    def read_blocks(self, file: BinaryIO) -> Iterator[bytes]:
+        while True:
+            block = file.read(self.chunk_size)
+            if not block:
+                return
+            yield block
+    
+    def iter_decoded(self, file: BinaryIO, encoding: str = 'utf-8') -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        for block in self.read_blocks(file):
+            text = decoder.decode(block)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
 
 class FileProcessorFactory:
     def __init__(self, processors: Dict[str, FileProcessor] = None):
@@ -55,22 +83,91 @@ class FileProcessorFactory:
         return self.create(processor_type)
 
 class TextFileProcessor(FileProcessor):
+    def __init__(self, chunk_size: int = 8192, mmap_threshold: int = MMAP_THRESHOLD, **kwargs):
+        super().__init__(chunk_size, **kwargs)
+        self.mmap_threshold = mmap_threshold
+    
     def process_file(self, file: BinaryIO) -> List[str]:
-        content = file.read()
-        return [content.decode('utf-8')]
+        return [''.join(self.iter_process(file))]
+    
+    def iter_process(self, file: BinaryIO) -> Iterator[str]:
+        return self.iter_decoded(file)
+    
+    def read_blocks(self, file: BinaryIO) -> Iterator[bytes]:
+        if not self.should_mmap(file):
+            yield from super().read_blocks(file)
+            return
+        
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(file.tell(), len(mapped), self.chunk_size):
+                yield mapped[offset:offset + self.chunk_size]
+    
+    def should_mmap(self, file: BinaryIO) -> bool:
+        if self.mmap_threshold is None:
+            return False
+        try:
+            file_size = os.fstat(file.fileno()).st_size
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return False
+        return file_size >= max(self.mmap_threshold, 1)
     
     def process(self, text: str) -> List[str]:
         return [text]
 
+class HTMLTextExtractor(HTMLParser):
+    SKIPPED_TAGS = {'script', 'style'}
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pending = ''
+        self.skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self.skip_depth += 1
+        self.pending += ' '
+    
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        self.pending += ' '
+    
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.pending += data
+    
+    def drain(self, final: bool = False) -> str:
+        cut = len(self.pending)
+        if not final:
+            while cut and not self.pending[cut - 1].isspace():
+                cut -= 1
+        words = self.pending[:cut].split()
+        self.pending = self.pending[cut:]
+        return ' '.join(words) + ' ' if words else ''
+
 class HTMLFileProcessor(FileProcessor):
     def process_file(self, file: BinaryIO) -> List[str]:
         content = file.read()
         html_text = content.decode('utf-8')
         return self.process(html_text)
     
+    def iter_process(self, file: BinaryIO) -> Iterator[str]:
+        extractor = HTMLTextExtractor()
+        for html_text in self.iter_decoded(file):
+            extractor.feed(html_text)
+            text = extractor.drain()
+            if text:
+                yield text
+        extractor.close()
+        text = extractor.drain(final=True)
+        if text:
+            yield text
+    
     def process(self, html: str) -> List[str]:
-        soup = BeautifulSoup(html, 'html.parser')
-        return [soup.get_text(separator=' ', strip=True)]
+        extractor = HTMLTextExtractor()
+        extractor.feed(html)
+        extractor.close()
+        return [extractor.drain(final=True).strip()]
 
 class PDFFileProcessor(FileProcessor):
     def process_file(self, file: BinaryIO) -> List[str]:
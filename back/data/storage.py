@@ -1,10 +1,48 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, text
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from collections import namedtuple
 from datetime import datetime, timezone
+import json
 from pgvector.sqlalchemy import Vector
 from config import config
 
+EMBEDDING_DIMENSIONS = 1536  # OpenAI embeddings are 1536 dimensions
+EMBEDDING_INDEX_NAME = 'data_chunks_embedding_idx'
+DUPLICATE_DISTANCE = 0.01
+HNSW_DEFAULT_EF_SEARCH = 40
+
+RetrievedChunk = namedtuple('RetrievedChunk', ['filename', 'chunk_index', 'chunk_text', 'distance'])
+
+EMBEDDING_SQL_TYPE = f'vector({EMBEDDING_DIMENSIONS})'
+
+EXACT_DISTANCE = f"embedding <=> CAST({{query}} AS {EMBEDDING_SQL_TYPE})"
+HALFVEC_EXPRESSION = f"embedding::halfvec({EMBEDDING_DIMENSIONS})"
+BINARY_EXPRESSION = f"binary_quantize(embedding)::bit({EMBEDDING_DIMENSIONS})"
+
+EMBEDDING_STORAGE_MODES = {
+    'vector': {
+        'index_expression': 'embedding',
+        'index_ops': 'vector_cosine_ops',
+        'search_distance': EXACT_DISTANCE,
+    },
+    'halfvec': {
+        'index_expression': f'({HALFVEC_EXPRESSION})',
+        'index_ops': 'halfvec_cosine_ops',
+        'search_distance': f"{HALFVEC_EXPRESSION} <=> CAST({{query}} AS halfvec({EMBEDDING_DIMENSIONS}))",
+    },
+    'binary': {
+        'index_expression': f'({BINARY_EXPRESSION})',
+        'index_ops': 'bit_hamming_ops',
+        'search_distance': f"{BINARY_EXPRESSION} <~> binary_quantize(CAST({{query}} AS {EMBEDDING_SQL_TYPE}))",
+    },
+}
+
+if config.EMBEDDING_STORAGE not in EMBEDDING_STORAGE_MODES:
+    raise ValueError(f'Unknown embedding storage: {config.EMBEDDING_STORAGE}')
+
+embedding_storage = EMBEDDING_STORAGE_MODES[config.EMBEDDING_STORAGE]
+
 Base = declarative_base()
 
 class Participant(Base):
@@ -25,12 +63,15 @@ class Message(Base):
 
 class DataChunk(Base):
     __tablename__ = 'data_chunks'
+    __table_args__ = (
+        Index('ix_data_chunks_filename_chunk_index', 'filename', 'chunk_index'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    filename = Column(String, index=True)
+    filename = Column(String)
     chunk_index = Column(Integer, index=True)
     chunk_text = Column(Text)
-    embedding = Column(Vector(1536))  # OpenAI embeddings are 1536 dimensions
+    embedding = Column(Vector(EMBEDDING_DIMENSIONS))
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 # Database setup
@@ -46,16 +87,133 @@ def get_db():
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for index in DataChunk.__table__.indexes:
+            index.create(bind=connection, checkfirst=True)
+        connection.execute(text("DROP INDEX IF EXISTS ix_data_chunks_filename"))
+
+def create_embedding_index_sql() -> str:
+    return (
+        f"CREATE INDEX {EMBEDDING_INDEX_NAME} ON data_chunks "
+        f"USING hnsw ({embedding_storage['index_expression']} {embedding_storage['index_ops']})"
+    )
+
+def migrate_embedding_storage():
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP INDEX IF EXISTS {EMBEDDING_INDEX_NAME}"))
+        connection.execute(text(create_embedding_index_sql()))
+
+def format_embedding(embedding) -> str:
+    return '[' + ','.join(map(str, embedding)) + ']'
+
+def exact_distance_sql(query: str = ':embedding') -> str:
+    return EXACT_DISTANCE.format(query=query)
+
+def chunk_search_sql(query: str, rerank_factor: int) -> str:
+    exact_distance = exact_distance_sql(query)
+    search_distance = embedding_storage['search_distance'].format(query=query)
+    
+    if rerank_factor <= 1:
+        return f"""
+            SELECT filename, chunk_index, chunk_text, {exact_distance} as distance
+            FROM data_chunks
+            ORDER BY {search_distance}
+            LIMIT :limit
+        """
+    
+    return f"""
+        SELECT filename, chunk_index, chunk_text, distance
+        FROM (
+            SELECT filename, chunk_index, chunk_text, {exact_distance} as distance
+            FROM data_chunks
+            ORDER BY {search_distance}
+            LIMIT :candidates
+        ) candidates
+        ORDER BY distance
+        LIMIT :limit
+    """
+
+def search_candidate_count(limit: int, rerank_factor: int) -> int:
+    return limit * rerank_factor if rerank_factor > 1 else limit
+
+def set_hnsw_ef_search(db, candidates: int):
+    db.execute(text(f"SET LOCAL hnsw.ef_search = {max(HNSW_DEFAULT_EF_SEARCH, int(candidates))}"))
+
+def search_data_chunks(db, embedding, limit: int, rerank_factor: int = 0) -> list:
+    set_hnsw_ef_search(db, search_candidate_count(limit, rerank_factor))
+    return db.execute(
+        text(chunk_search_sql(':embedding', rerank_factor)),
+        {"embedding": format_embedding(embedding), "limit": limit, "candidates": limit * rerank_factor}
+    ).fetchall()
+
+def search_data_chunks_batch(db, embeddings: list, limit: int, rerank_factor: int = 0) -> list:
+    set_hnsw_ef_search(db, search_candidate_count(limit, rerank_factor))
+    rows = db.execute(
+        text(f"""
+            SELECT queries.query_index, chunks.filename, chunks.chunk_index, chunks.chunk_text, chunks.distance
+            FROM unnest(CAST(:embeddings AS text[])) WITH ORDINALITY AS queries(embedding, query_index)
+            CROSS JOIN LATERAL ({chunk_search_sql('queries.embedding', rerank_factor)}) chunks
+            ORDER BY queries.query_index, chunks.distance
+        """),
+        {
+            "embeddings": [format_embedding(embedding) for embedding in embeddings],
+            "limit": limit,
+            "candidates": limit * rerank_factor,
+        }
+    ).fetchall()
+    
+    chunks = [[] for _ in embeddings]
+    for row in rows:
+        chunks[row.query_index - 1].append(row)
+    return chunks
+
+def fetch_chunk_windows(db, windows: list) -> list:
+    return db.execute(
+        text("""
+            SELECT windows.window_index, data_chunks.chunk_index, data_chunks.chunk_text
+            FROM unnest(CAST(:filenames AS text[]), CAST(:starts AS integer[]), CAST(:ends AS integer[]))
+                WITH ORDINALITY AS windows(filename, start_index, end_index, window_index)
+            JOIN data_chunks
+                ON data_chunks.filename = windows.filename
+                AND data_chunks.chunk_index BETWEEN windows.start_index AND windows.end_index
+            ORDER BY windows.window_index, data_chunks.chunk_index, data_chunks.id
+        """),
+        {
+            "filenames": [window['filename'] for window in windows],
+            "starts": [window['start_index'] for window in windows],
+            "ends": [window['end_index'] for window in windows],
+        }
+    ).fetchall()
+
+def exact_search_data_chunks(db, embedding, limit: int) -> list:
+    db.execute(text("SET LOCAL enable_indexscan = off"))
+    chunks = db.execute(
+        text(f"""
+            SELECT filename, chunk_index, chunk_text, {exact_distance_sql()} as distance
+            FROM data_chunks
+            ORDER BY distance
+            LIMIT :limit
+        """),
+        {"embedding": format_embedding(embedding), "limit": limit}
+    ).fetchall()
+    db.rollback()
+    return chunks
+
+def sample_embeddings(db, count: int) -> list:
+    rows = db.execute(
+        text("SELECT embedding::text FROM data_chunks ORDER BY random() LIMIT :count"),
+        {"count": count}
+    ).fetchall()
+    return [json.loads(row[0]) for row in rows]
 
 def repopulate_data_chunks(data_chunks: list):
     db = SessionLocal()
     
     new_chunks = []
     for chunk in data_chunks:
-        # Use raw SQL with pgvector cosine distance function
-        embedding_str = '[' + ','.join(map(str, chunk.embedding)) + ']'
         result = db.execute(
-            text(f"SELECT id FROM data_chunks WHERE embedding <=> '{embedding_str}'::vector < 0.01 LIMIT 1")
+            text(f"SELECT id FROM data_chunks WHERE {exact_distance_sql()} < :distance LIMIT 1"),
+            {"embedding": format_embedding(chunk.embedding), "distance": DUPLICATE_DISTANCE}
         ).fetchone()
         
         if not result:
@@ -0,0 +1,230 @@
+from pathlib import Path
+import contextlib
+import json
+import os
+import threading
+import time
+import uuid
+import numpy as np
+from sqlalchemy import text
+from config import config
+from data.storage import engine, EMBEDDING_DIMENSIONS, RetrievedChunk
+
+SNAPSHOT_BATCH_ROWS = 4096
+SEARCH_BLOCK_ROWS = 65536
+SNAPSHOT_LOAD_ATTEMPTS = 3
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+def parse_embeddings(embedding_texts: list) -> np.ndarray:
+    matrix = np.array([json.loads(embedding_text) for embedding_text in embedding_texts], dtype=np.float32)
+    return normalize_rows(matrix.reshape(len(embedding_texts), EMBEDDING_DIMENSIONS))
+
+def fetch_table_stats(connection):
+    count, max_id = connection.execute(
+        text("SELECT count(*), coalesce(max(id), 0) FROM data_chunks")
+    ).fetchone()
+    return count, max_id
+
+def fetch_rows_after(connection, min_id: int, max_id: int):
+    return connection.execution_options(stream_results=True, yield_per=SNAPSHOT_BATCH_ROWS).execute(
+        text("""
+            SELECT id, filename, chunk_index, embedding::text
+            FROM data_chunks
+            WHERE id > :min_id AND id <= :max_id
+            ORDER BY id
+        """),
+        {"min_id": min_id, "max_id": max_id}
+    )
+
+def read_snapshot_metadata(metadata_path: Path):
+    if not metadata_path.exists():
+        return None
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def snapshot_matrix_path(base_path: Path, metadata: dict) -> Path:
+    return base_path.with_name(metadata.get('matrix', base_path.with_suffix('.npy').name))
+
+def write_vector_index_snapshot(path: str = None) -> int:
+    base_path = Path(path or config.VECTOR_INDEX_PATH)
+    metadata_path = base_path.with_suffix('.json')
+    version = f'{os.getpid()}-{uuid.uuid4().hex}'
+    matrix_path = base_path.with_suffix(f'.{version}.npy')
+    temp_metadata_path = base_path.with_suffix(f'.{version}.tmp.json')
+
+    with engine.connect() as connection:
+        count, max_id = fetch_table_stats(connection)
+        matrix = np.lib.format.open_memmap(
+            matrix_path, mode='w+', dtype=np.float32, shape=(count, EMBEDDING_DIMENSIONS)
+        )
+        ids, filenames, chunk_indexes = [], [], []
+
+        for partition in fetch_rows_after(connection, 0, max_id).partitions():
+            partition = partition[:count - len(ids)]
+            if not partition:
+                break
+            matrix[len(ids):len(ids) + len(partition)] = parse_embeddings([row[3] for row in partition])
+            ids.extend(row[0] for row in partition)
+            filenames.extend(row[1] for row in partition)
+            chunk_indexes.extend(row[2] for row in partition)
+
+        matrix.flush()
+        del matrix
+
+    with open(temp_metadata_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'matrix': matrix_path.name,
+            'rows': len(ids),
+            'max_id': max_id,
+            'ids': ids,
+            'filenames': filenames,
+            'chunk_indexes': chunk_indexes,
+        }, f)
+
+    previous_metadata = read_snapshot_metadata(metadata_path)
+    os.replace(temp_metadata_path, metadata_path)
+
+    if previous_metadata:
+        previous_matrix_path = snapshot_matrix_path(base_path, previous_metadata)
+        if previous_matrix_path != matrix_path:
+            with contextlib.suppress(OSError):
+                previous_matrix_path.unlink()
+    return len(ids)
+
+class NumpyVectorIndex:
+    def __init__(self, path: str, refresh_seconds: float = 30):
+        self.path = Path(path)
+        self.refresh_seconds = refresh_seconds
+        self.lock = threading.Lock()
+        self.last_refresh = 0.0
+        self.rebuilding = False
+        self.load()
+
+    def read_snapshot(self):
+        for attempt in range(SNAPSHOT_LOAD_ATTEMPTS):
+            metadata = read_snapshot_metadata(self.path.with_suffix('.json'))
+            try:
+                return metadata, np.load(snapshot_matrix_path(self.path, metadata), mmap_mode='r')
+            except FileNotFoundError:
+                if attempt == SNAPSHOT_LOAD_ATTEMPTS - 1:
+                    raise
+
+    def load(self):
+        if not self.path.with_suffix('.json').exists():
+            write_vector_index_snapshot(str(self.path))
+        self.apply_snapshot(*self.read_snapshot())
+
+    def apply_snapshot(self, metadata: dict, matrix: np.ndarray):
+        self.snapshot = matrix[:metadata['rows']]
+        self.delta = np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+        self.ids = metadata['ids']
+        self.filenames = metadata['filenames']
+        self.chunk_indexes = metadata['chunk_indexes']
+        self.max_id = metadata['max_id']
+        self.last_refresh = time.monotonic()
+
+    def refresh(self) -> bool:
+        with engine.connect() as connection:
+            count, max_id = fetch_table_stats(connection)
+            if max_id < self.max_id:
+                return False
+
+            new_rows = fetch_rows_after(connection, self.max_id, max_id).fetchall()
+
+        if len(self.ids) + len(new_rows) != count:
+            return False
+
+        if new_rows:
+            self.delta = np.vstack([self.delta, parse_embeddings([row[3] for row in new_rows])])
+            self.ids.extend(row[0] for row in new_rows)
+            self.filenames.extend(row[1] for row in new_rows)
+            self.chunk_indexes.extend(row[2] for row in new_rows)
+
+        self.max_id = max_id
+        self.last_refresh = time.monotonic()
+        return True
+
+    def claim_rebuild(self) -> bool:
+        if self.rebuilding or time.monotonic() - self.last_refresh < self.refresh_seconds or self.refresh():
+            return False
+        self.rebuilding = True
+        return True
+
+    def rebuild(self):
+        try:
+            write_vector_index_snapshot(str(self.path))
+            metadata, matrix = self.read_snapshot()
+            with self.lock:
+                self.apply_snapshot(metadata, matrix)
+        finally:
+            with self.lock:
+                self.rebuilding = False
+
+    def iter_blocks(self):
+        for offset in range(0, len(self.snapshot), SEARCH_BLOCK_ROWS):
+            yield offset, self.snapshot[offset:offset + SEARCH_BLOCK_ROWS]
+        if len(self.delta):
+            yield len(self.snapshot), self.delta
+
+    def top_k(self, queries: np.ndarray, limit: int):
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+
+        for offset, block in self.iter_blocks():
+            scores = np.concatenate([best_scores, queries @ block.T], axis=1)
+            rows = np.concatenate([best_rows, np.broadcast_to(np.arange(offset, offset + len(block)), (len(queries), len(block)))], axis=1)
+            if scores.shape[1] > limit:
+                keep = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                rows = np.take_along_axis(rows, keep, axis=1)
+            best_scores, best_rows = scores, rows
+
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_rows, order, axis=1)
+
+    def fetch_chunk_texts(self, ids: list) -> dict:
+        with engine.connect() as connection:
+            rows = connection.execute(
+                text("SELECT id, chunk_text FROM data_chunks WHERE id = ANY(:ids)"),
+                {"ids": ids}
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def search_batch(self, embeddings: list, limit: int) -> list:
+        queries = normalize_rows(np.asarray(embeddings, dtype=np.float32).reshape(-1, EMBEDDING_DIMENSIONS))
+
+        with self.lock:
+            should_rebuild = self.claim_rebuild()
+        if should_rebuild:
+            self.rebuild()
+
+        with self.lock:
+            scores, rows = self.top_k(queries, limit)
+            hits = [
+                [(self.ids[row], self.filenames[row], self.chunk_indexes[row], float(score)) for score, row in zip(query_scores, query_rows)]
+                for query_scores, query_rows in zip(scores, rows)
+            ]
+
+        chunk_texts = self.fetch_chunk_texts(sorted({hit[0] for query_hits in hits for hit in query_hits}))
+        return [
+            [
+                RetrievedChunk(filename, chunk_index, chunk_texts[chunk_id], 1 - score)
+                for chunk_id, filename, chunk_index, score in query_hits
+                if chunk_id in chunk_texts
+            ]
+            for query_hits in hits
+        ]
+
+    def search(self, embedding: list, limit: int) -> list:
+        return self.search_batch([embedding], limit)[0]
+
+def create_vector_index():
+    if config.VECTOR_INDEX == 'database':
+        return None
+    if config.VECTOR_INDEX == 'numpy':
+        return NumpyVectorIndex(config.VECTOR_INDEX_PATH, config.VECTOR_INDEX_REFRESH_SECONDS)
+    raise ValueError(f'Unknown vector index: {config.VECTOR_INDEX}')
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import random
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import config
+from data.storage import EMBEDDING_DIMENSIONS
+
+FAKE_LLM_HOST = '127.0.0.1'
+
+def fake_embedding(text: str) -> list:
+    seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+    generator = random.Random(seed)
+    values = [generator.gauss(0, 1) for _ in range(EMBEDDING_DIMENSIONS)]
+    norm = sum(value * value for value in values) ** 0.5
+    return [value / norm for value in values]
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+
+        if config.FAKE_LLM_LATENCY_SECONDS:
+            time.sleep(config.FAKE_LLM_LATENCY_SECONDS)
+
+        if random.random() < config.FAKE_LLM_FAILURE_RATE:
+            self.send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}},
+                           {'Retry-After': str(config.FAKE_LLM_RETRY_AFTER_SECONDS)})
+            return
+
+        if self.path.endswith('/chat/completions'):
+            self.send_json(200, self.chat_completion(body))
+        elif self.path.endswith('/embeddings'):
+            self.send_json(200, self.embeddings(body))
+        else:
+            self.send_json(404, {'error': {'message': f'Unknown path: {self.path}', 'type': 'invalid_request_error'}})
+
+    def chat_completion(self, body: dict) -> dict:
+        prompt = body['messages'][-1]['content']
+        content = f"Fake answer to: {prompt[-200:]}"
+        prompt_tokens = sum(count_words(message['content']) for message in body['messages'])
+        completion_tokens = count_words(content)
+        return {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'fake'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }
+
+    def embeddings(self, body: dict) -> dict:
+        texts = [body['input']] if isinstance(body['input'], str) else body['input']
+        tokens = sum(count_words(text) for text in texts)
+        return {
+            'object': 'list',
+            'model': body.get('model', 'fake'),
+            'data': [
+                {'object': 'embedding', 'index': index, 'embedding': fake_embedding(text)}
+                for index, text in enumerate(texts)
+            ],
+            'usage': {'prompt_tokens': tokens, 'total_tokens': tokens},
+        }
+
+    def send_json(self, status: int, payload: dict, headers: dict = None):
+        encoded = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+def create_fake_llm_server(port: int) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((FAKE_LLM_HOST, port), FakeLLMHandler)
+
+def run_fake_llm_server(port: int):
+    server = create_fake_llm_server(port)
+    print(f"Fake LLM server listening on http://{FAKE_LLM_HOST}:{port}/v1")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    run_fake_llm_server(int(sys.argv[1]) if len(sys.argv) > 1 else config.FAKE_LLM_PORT)
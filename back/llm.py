@@ -1,18 +1,56 @@
 from openai import OpenAI
 from config import config
+from llm_client import RateLimiter, ResilientClient
 import tiktoken
 
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
 class LLMWrapper:
     def __init__(self):
-        self.client = OpenAI(api_key=config.OPENAI_KEY)
+        self.client = OpenAI(api_key=config.OPENAI_KEY, base_url=config.OPENAI_BASE_URL or None, max_retries=0)
         self.model = config.OPENAI_MODEL
         # Initialize tokenizer for token counting
         self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.completions = self.create_resilient_client(
+            config.LLM_REQUESTS_PER_MINUTE, config.LLM_TOKENS_PER_MINUTE
+        )
+        self.embeddings = self.create_resilient_client(
+            config.EMBEDDING_REQUESTS_PER_MINUTE, config.EMBEDDING_TOKENS_PER_MINUTE
+        )
     
-    def generate(self, prompt: str) -> str:
-        response = self.client.chat.completions.create(
+    def create_resilient_client(self, requests_per_minute: int, tokens_per_minute: int) -> ResilientClient:
+        return ResilientClient(
+            RateLimiter(requests_per_minute, tokens_per_minute),
+            timeout=config.LLM_TIMEOUT_SECONDS,
+            max_retries=config.LLM_MAX_RETRIES,
+            backoff_base=config.LLM_BACKOFF_BASE_SECONDS,
+            backoff_max=config.LLM_BACKOFF_MAX_SECONDS
+        )
+    
+    def estimate_completion_tokens(self, messages: list) -> int:
+        prompt_tokens = sum(self.count_tokens(message["content"]) for message in messages)
+        return prompt_tokens + config.LLM_COMPLETION_TOKENS_ESTIMATE
+    
+    def create_completion(self, messages: list):
+        return self.completions.call(
+            self.client.chat.completions.create,
+            self.estimate_completion_tokens(messages),
             model=self.model,
-            messages=[
+            messages=messages
+        )
+    
+    def create_embeddings(self, input):
+        texts = [input] if isinstance(input, str) else input
+        return self.embeddings.call(
+            self.client.embeddings.create,
+            sum(self.count_tokens(text) for text in texts),
+            model=EMBEDDING_MODEL,
+            input=input
+        )
+    
+    def generate(self, prompt: str) -> str:
+        response = self.create_completion(
+            [
                 {"role": "user", "content": prompt}
             ]
         )
@@ -26,21 +64,19 @@ class LLMWrapper:
                 "content": message.content
             })
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages
-        )
+        response = self.create_completion(messages)
         return response.choices[0].message.content
     
     def count_tokens(self, text: str) -> int:
         return len(self.tokenizer.encode(text))
     
     def generate_embedding(self, text: str) -> list:
-        response = self.client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
+        response = self.create_embeddings(text)
         return response.data[0].embedding
+    
+    def generate_embeddings(self, texts: list) -> list:
+        response = self.create_embeddings(texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
 
 # Global instance
 llm = LLMWrapper()
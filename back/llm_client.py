@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+from openai import APIConnectionError, APIStatusError, InternalServerError, RateLimitError
+
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+SECONDS_PER_MINUTE = 60
+
+class TokenBucket:
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = capacity_per_minute
+        self.refill_rate = capacity_per_minute / SECONDS_PER_MINUTE
+        self.available = capacity_per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing / self.refill_rate)
+
+    def consume(self, amount: float):
+        self.available -= amount
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.lock = threading.Lock()
+        self.paused_until = 0.0
+
+    def acquire(self, tokens: int):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                wait = max(
+                    self.paused_until - now,
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(tokens),
+                )
+                if wait <= 0:
+                    self.requests.consume(1)
+                    self.tokens.consume(tokens)
+                    return
+            time.sleep(wait)
+
+    def adjust(self, tokens: int):
+        with self.lock:
+            self.tokens.consume(tokens)
+
+    def pause(self, seconds: float):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+def parse_retry_after(error: Exception):
+    if not isinstance(error, APIStatusError):
+        return None
+
+    headers = error.response.headers
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class ResilientClient:
+    def __init__(self, limiter: RateLimiter, timeout: float, max_retries: int,
+                 backoff_base: float, backoff_max: float):
+        self.limiter = limiter
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, create, estimated_tokens: int, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(estimated_tokens)
+            try:
+                response = create(timeout=self.timeout, **kwargs)
+            except RETRYABLE_ERRORS as error:
+                if attempt == self.max_retries:
+                    raise
+                self.limiter.adjust(-estimated_tokens)
+                retry_after = parse_retry_after(error)
+                self.limiter.pause(retry_after if retry_after is not None else self.backoff_delay(attempt))
+                continue
+
+            usage = getattr(response, 'usage', None)
+            if usage is not None:
+                self.limiter.adjust(usage.total_tokens - estimated_tokens)
+            return response
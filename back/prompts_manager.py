@@ -1,17 +1,31 @@
 import os
 from typing import Dict, Any
+from config import config
 
 class PromptsManager:
-    def __init__(self, prompts_dir: str = 'prompts'):
+    def __init__(self, prompts_dir: str = 'prompts', auto_reload: bool = config.ENVIRONMENT == 'development'):
         self.prompts_dir = prompts_dir
+        self.auto_reload = auto_reload
+        self.templates = {}
     
-    def render(self, name: str, args: Dict[str, Any]) -> str:
+    def get_template(self, name: str) -> str:
+        cached = self.templates.get(name)
+        if cached and not self.auto_reload:
+            return cached[1]
+        
         prompt_path = os.path.join(self.prompts_dir, f'{name}.txt')
+        modified = os.stat(prompt_path).st_mtime_ns
+        if cached and cached[0] == modified:
+            return cached[1]
         
         with open(prompt_path, 'r') as f:
             template = f.read()
         
-        return template.format(**args)
+        self.templates[name] = (modified, template)
+        return template
+    
+    def render(self, name: str, args: Dict[str, Any]) -> str:
+        return self.get_template(name).format(**args)
 
 # Global instance
 prompts = PromptsManager()
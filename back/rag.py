@@ -1,34 +1,117 @@
-from sqlalchemy import text
-from data.storage import SessionLocal
+from config import config
+from data.chunking import merge_chunk_texts
+from data.storage import SessionLocal, RetrievedChunk, search_data_chunks, search_data_chunks_batch, fetch_chunk_windows
 
 class RAGProcessor:
-    def __init__(self, llm, template_manager):
+    def __init__(self, llm, template_manager, vector_index=None):
         self.llm = llm
         self.template_manager = template_manager
+        self.vector_index = vector_index
     
-    def get_relevant_chunks(self, question: str, limit: int = 5) -> list:
+    def get_relevant_chunks(self, question: str, limit: int = 5, neighbors: int = None) -> list:
         """Find the most relevant chunks for a question using vector similarity."""
-        db = SessionLocal()
-        
         # Generate embedding for the question
         question_embedding = self.llm.generate_embedding(question)
         
-        # Convert to string format for pgvector
-        embedding_str = '[' + ','.join(map(str, question_embedding)) + ']'
+        if self.vector_index:
+            chunks = self.vector_index.search(question_embedding, limit)
+        else:
+            db = SessionLocal()
+            
+            # Search the compact index, re-ranking candidates by exact distance when enabled
+            rerank_factor = config.EMBEDDING_RERANK_FACTOR if config.EMBEDDING_RERANK else 0
+            chunks = search_data_chunks(db, question_embedding, limit, rerank_factor)
+            
+            db.close()
+        
+        return self.expand_neighbors(chunks, config.RETRIEVAL_NEIGHBORS if neighbors is None else neighbors)
+    
+    def get_relevant_chunks_batch(self, embeddings: list, limit: int = 5, neighbors: int = None) -> list:
+        """Find the most relevant chunks for several question embeddings in one query."""
+        if self.vector_index:
+            chunks_batch = self.vector_index.search_batch(embeddings, limit)
+        else:
+            db = SessionLocal()
+            rerank_factor = config.EMBEDDING_RERANK_FACTOR if config.EMBEDDING_RERANK else 0
+            chunks_batch = search_data_chunks_batch(db, embeddings, limit, rerank_factor)
+            db.close()
+        
+        return self.expand_neighbors_batch(chunks_batch, config.RETRIEVAL_NEIGHBORS if neighbors is None else neighbors)
+    
+    def merge_windows(self, chunks: list, neighbors: int) -> list:
+        """Turn hits into per-file chunk ranges, merging ranges that overlap or touch."""
+        ranges = sorted(
+            (chunk.filename, max(0, chunk.chunk_index - neighbors), chunk.chunk_index + neighbors, chunk.distance, chunk.chunk_index)
+            for chunk in chunks
+        )
+        
+        windows = []
+        for filename, start_index, end_index, distance, chunk_index in ranges:
+            previous = windows[-1] if windows else None
+            if previous and previous['filename'] == filename and start_index <= previous['end_index'] + 1:
+                previous['end_index'] = max(previous['end_index'], end_index)
+                if distance < previous['distance']:
+                    previous['distance'] = distance
+                    previous['chunk_index'] = chunk_index
+            else:
+                windows.append({
+                    'filename': filename,
+                    'chunk_index': chunk_index,
+                    'start_index': start_index,
+                    'end_index': end_index,
+                    'distance': distance
+                })
+        
+        return sorted(windows, key=lambda window: window['distance'])
+    
+    def expand_neighbors(self, chunks: list, neighbors: int) -> list:
+        """Replace hits with merged windows of their neighboring chunks, fetched in one range query."""
+        return self.expand_neighbors_batch([chunks], neighbors)[0]
+    
+    def expand_neighbors_batch(self, chunks_batch: list, neighbors: int) -> list:
+        """Expand the hits of several questions with a single range query over all their windows."""
+        if neighbors <= 0:
+            return chunks_batch
         
-        # Use pgvector to find most similar chunks
-        chunks = db.execute(
-            text(f"""
-                SELECT filename, chunk_index, chunk_text, embedding <=> '{embedding_str}'::vector as distance
-                FROM data_chunks 
-                ORDER BY embedding <=> '{embedding_str}'::vector 
-                LIMIT :limit
-            """),
-            {"limit": limit}
-        ).fetchall()
+        windows_batch = [self.merge_windows(chunks, neighbors) for chunks in chunks_batch]
+        windows = [window for windows in windows_batch for window in windows]
+        if not windows:
+            return [[] for _ in chunks_batch]
         
+        db = SessionLocal()
+        rows = fetch_chunk_windows(db, windows)
         db.close()
-        return chunks
+        
+        window_texts = [{} for _ in windows]
+        for row in rows:
+            window_texts[row.window_index - 1].setdefault(row.chunk_index, row.chunk_text)
+        
+        expanded = [
+            RetrievedChunk(
+                window['filename'],
+                window['chunk_index'],
+                merge_chunk_texts([texts[chunk_index] for chunk_index in sorted(texts)]),
+                window['distance']
+            ) if texts else None
+            for window, texts in zip(windows, window_texts)
+        ]
+        
+        chunks_by_question = []
+        offset = 0
+        for question_windows in windows_batch:
+            question_chunks = expanded[offset:offset + len(question_windows)]
+            chunks_by_question.append([chunk for chunk in question_chunks if chunk])
+            offset += len(question_windows)
+        return chunks_by_question
+    
+    def answer(self, question: str, chunks: list, messages: list = []) -> str:
+        """Generate an answer to a question from retrieved chunks and conversation history."""
+        rag_prompt = self.template_manager.render_rag_prompt(question, chunks, messages)
+        return self.llm.generate(rag_prompt)
+    
+    def ask(self, question: str, limit: int = 5) -> str:
+        """Answer a standalone question without conversation history."""
+        return self.answer(question, self.get_relevant_chunks(question, limit=limit))
     
     def process(self, chat) -> str:
         """Process a chat through the RAG system with conversation history."""
@@ -44,14 +127,5 @@ class RAGProcessor:
         # Get relevant chunks for the latest message
         relevant_chunks = self.get_relevant_chunks(latest_message['content'], limit=5)
         
-        # Create RAG prompt with conversation history
-        rag_prompt = self.template_manager.render_rag_prompt(
-            latest_message['content'], 
-            relevant_chunks, 
-            last_5_messages[:-1]  # Pass messages directly, excluding the latest
-        )
-        
-        # Generate answer using LLM
-        answer = self.llm.generate(rag_prompt)
-        
-        return answer
\ No newline at end of file
+        # Generate answer with conversation history, excluding the latest message
+        return self.answer(latest_message['content'], relevant_chunks, last_5_messages[:-1])
\ No newline at end of file
@@ -1,15 +1,34 @@
 from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
+from config import config
+
+TEMPLATES_DIRECTORY = Path(__file__).resolve().parent / "templates"
+RAG_PROMPT_PREFIX_TEMPLATE = "rag_prompt_prefix.j2"
+RAG_PROMPT_TEMPLATE = "rag_prompt.j2"
+PROMPT_SECTION_SEPARATOR = "\n\n"
 
 class TemplateManager:
-    def __init__(self, templates_dir: str = "templates"):
+    def __init__(self, templates_dir: Path = TEMPLATES_DIRECTORY, auto_reload: bool = config.ENVIRONMENT == 'development'):
         self.templates_dir = Path(templates_dir)
-        self.env = Environment(loader=FileSystemLoader(self.templates_dir))
+        self.env = Environment(loader=FileSystemLoader(self.templates_dir), auto_reload=auto_reload)
+        self.static_renders = {}
+    
+    def render_static(self, name: str) -> str:
+        template = self.env.get_template(name)
+        cached = self.static_renders.get(name)
+        if cached is None or cached[0] is not template:
+            cached = (template, template.render())
+            self.static_renders[name] = cached
+        return cached[1]
     
     def render_rag_prompt(self, question: str, chunks: list, messages: list = []) -> str:
-        template = self.env.get_template("rag_prompt.j2")
-        return template.render(
+        prefix = self.render_static(RAG_PROMPT_PREFIX_TEMPLATE)
+        body = self.env.get_template(RAG_PROMPT_TEMPLATE).render(
             question=question, 
             chunks=chunks, 
             messages=messages
-        )
\ No newline at end of file
+        )
+        return prefix + PROMPT_SECTION_SEPARATOR + body
+
+# Global instance
+template_manager = TemplateManager()
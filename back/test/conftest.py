@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+BACK_DIRECTORY = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(BACK_DIRECTORY))
+os.environ.setdefault('OPENAI_KEY', 'test-key')
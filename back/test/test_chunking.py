@@ -0,0 +1,51 @@
+import pytest
+from data import chunking
+from data.chunking import chunk_stream, chunk_text
+from data.file_processor import DOCUMENT_BOUNDARY
+
+MAX_TOKENS = 400
+OVERLAP_TOKENS = 40
+
+class WordTokenizer:
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+@pytest.fixture(autouse=True)
+def word_tokenizer(monkeypatch):
+    monkeypatch.setattr(chunking, 'llm', WordTokenizer())
+
+def split_pieces(text: str, size: int) -> list:
+    return [text[offset:offset + size] for offset in range(0, len(text), size)]
+
+def test_chunk_stream_matches_chunk_text_for_sentences():
+    text = " ".join(f"Sentence number {index} has a few words in it." for index in range(3000))
+
+    streamed = list(chunk_stream(split_pieces(text, 100), MAX_TOKENS, OVERLAP_TOKENS))
+
+    assert streamed == chunk_text(text, MAX_TOKENS, OVERLAP_TOKENS)
+    assert len(streamed) > 2
+
+def test_chunk_stream_splits_text_without_sentence_boundaries():
+    max_chars = MAX_TOKENS * chunking.STREAM_CHARS_PER_TOKEN * 2
+    for word_count in (4000, 20000):
+        text = " ".join(f"word{index}" for index in range(word_count))
+
+        chunks = list(chunk_stream(split_pieces(text, 100), MAX_TOKENS, OVERLAP_TOKENS))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= max_chars for chunk in chunks)
+        assert chunks[-1].endswith(f"word{word_count - 1}")
+
+def test_chunk_stream_splits_lines_ending_with_period():
+    text = "".join(f"Line number {index} ends here.\n" for index in range(20000))
+
+    chunks = list(chunk_stream(split_pieces(text, 100), MAX_TOKENS, OVERLAP_TOKENS))
+
+    assert all(len(chunk) <= MAX_TOKENS * chunking.STREAM_CHARS_PER_TOKEN * 2 for chunk in chunks)
+    assert chunks[0].startswith("Line number 0 ends here.")
+    assert chunks[-1].endswith("Line number 19999 ends here.")
+
+def test_chunk_stream_does_not_span_documents():
+    chunks = list(chunk_stream(["First document.", DOCUMENT_BOUNDARY, "Second document.", DOCUMENT_BOUNDARY]))
+
+    assert chunks == ["First document.", "Second document."]
@@ -0,0 +1,52 @@
+import threading
+import pytest
+from openai import OpenAI
+from config import config
+from data.storage import EMBEDDING_DIMENSIONS
+from fake_llm_server import create_fake_llm_server
+from llm_client import RateLimiter, ResilientClient
+
+REQUEST_COUNT = 20
+
+@pytest.fixture
+def fake_server_url(monkeypatch):
+    monkeypatch.setattr(config, 'FAKE_LLM_FAILURE_RATE', 0.5)
+    monkeypatch.setattr(config, 'FAKE_LLM_RETRY_AFTER_SECONDS', 0)
+    monkeypatch.setattr(config, 'FAKE_LLM_LATENCY_SECONDS', 0)
+    server = create_fake_llm_server(0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/v1'
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def resilient_client():
+    return ResilientClient(
+        RateLimiter(requests_per_minute=100000, tokens_per_minute=10000000),
+        timeout=5,
+        max_retries=50,
+        backoff_base=0,
+        backoff_max=0
+    )
+
+def test_completions_succeed_through_injected_rate_limits(fake_server_url, resilient_client):
+    client = OpenAI(api_key='test-key', base_url=fake_server_url, max_retries=0)
+
+    answers = [
+        resilient_client.call(
+            client.chat.completions.create, 10,
+            model='fake', messages=[{'role': 'user', 'content': f'Question {index}'}]
+        ).choices[0].message.content
+        for index in range(REQUEST_COUNT)
+    ]
+
+    assert answers == [f'Fake answer to: Question {index}' for index in range(REQUEST_COUNT)]
+
+def test_embeddings_succeed_through_injected_rate_limits(fake_server_url, resilient_client):
+    client = OpenAI(api_key='test-key', base_url=fake_server_url, max_retries=0)
+
+    for index in range(REQUEST_COUNT):
+        response = resilient_client.call(client.embeddings.create, 10, model='fake', input=[f'text {index}', 'other'])
+        assert [item.index for item in response.data] == [0, 1]
+        assert len(response.data[0].embedding) == EMBEDDING_DIMENSIONS
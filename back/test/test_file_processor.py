@@ -0,0 +1,23 @@
+import io
+from data.file_processor import HTMLFileProcessor, TextFileProcessor
+
+def test_iter_decoded_joins_multibyte_characters_split_across_blocks():
+    text = "naïve café — 日本語 🙂" * 50
+    processor = TextFileProcessor(chunk_size=3, mmap_threshold=None)
+
+    pieces = list(processor.iter_process(io.BytesIO(text.encode('utf-8'))))
+
+    assert "".join(pieces) == text
+    assert len(pieces) > 1
+
+def test_html_extraction_skips_script_and_style():
+    html = (
+        "<html><head><style>body { color: red; }</style><script>var hidden = 1;</script></head>"
+        "<body><h1>Title</h1><p>First <b>bold</b> paragraph.</p><script>alert('x')</script><p>Last</p></body></html>"
+    )
+    processor = HTMLFileProcessor(chunk_size=7)
+
+    streamed = "".join(processor.iter_process(io.BytesIO(html.encode('utf-8'))))
+
+    assert streamed.split() == ["Title", "First", "bold", "paragraph.", "Last"]
+    assert processor.process(html) == ["Title First bold paragraph. Last"]
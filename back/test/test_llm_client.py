@@ -0,0 +1,140 @@
+import httpx
+import pytest
+from openai import APIConnectionError, BadRequestError, RateLimitError
+import llm_client
+from llm_client import RateLimiter, ResilientClient, parse_retry_after
+
+REQUEST = httpx.Request('POST', 'http://fake-llm/v1/chat/completions')
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class FakeResponse:
+    def __init__(self, total_tokens: int):
+        self.usage = type('Usage', (), {'total_tokens': total_tokens})()
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(llm_client, 'time', fake_clock)
+    return fake_clock
+
+def rate_limit_error(headers: dict = None) -> RateLimitError:
+    return RateLimitError('Rate limit reached', response=httpx.Response(429, headers=headers, request=REQUEST), body=None)
+
+def failing_create(errors: list, response=None):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if errors:
+            raise errors.pop(0)
+        return response
+
+    return create, calls
+
+def create_client(limiter: RateLimiter, max_retries: int = 3) -> ResilientClient:
+    return ResilientClient(limiter, timeout=5, max_retries=max_retries, backoff_base=1, backoff_max=8)
+
+def test_rate_limiter_waits_for_request_budget(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=100000)
+
+    for _ in range(60):
+        limiter.acquire(1)
+    assert clock.sleeps == []
+
+    limiter.acquire(1)
+    assert sum(clock.sleeps) == pytest.approx(1.0)
+
+def test_rate_limiter_waits_for_token_budget(clock):
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=600)
+
+    limiter.acquire(500)
+    limiter.acquire(200)
+
+    assert sum(clock.sleeps) == pytest.approx(10.0)
+
+def test_rate_limiter_adjust_returns_unused_tokens(clock):
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=600)
+
+    limiter.acquire(600)
+    limiter.adjust(-600)
+    limiter.acquire(600)
+
+    assert clock.sleeps == []
+
+def test_rate_limiter_pause_delays_acquire(clock):
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=100000)
+
+    limiter.pause(5)
+    limiter.acquire(1)
+
+    assert sum(clock.sleeps) == pytest.approx(5.0)
+
+def test_parse_retry_after_headers():
+    assert parse_retry_after(rate_limit_error({'retry-after-ms': '1500'})) == 1.5
+    assert parse_retry_after(rate_limit_error({'retry-after': '2'})) == 2.0
+    assert parse_retry_after(rate_limit_error()) is None
+    assert parse_retry_after(APIConnectionError(request=REQUEST)) is None
+
+def test_call_retries_and_pauses_for_retry_after(clock):
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=100000)
+    create, calls = failing_create(
+        [rate_limit_error({'retry-after-ms': '1500'}), rate_limit_error({'retry-after': '2'})],
+        FakeResponse(total_tokens=10)
+    )
+
+    response = create_client(limiter).call(create, 10, model='fake')
+
+    assert isinstance(response, FakeResponse)
+    assert len(calls) == 3
+    assert calls[0] == {'timeout': 5, 'model': 'fake'}
+    assert clock.sleeps == pytest.approx([1.5, 2.0])
+
+def test_call_backs_off_shared_limiter_without_retry_after(clock, monkeypatch):
+    monkeypatch.setattr(llm_client.random, 'uniform', lambda low, high: high)
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=100000)
+    create, calls = failing_create([rate_limit_error(), APIConnectionError(request=REQUEST)], FakeResponse(total_tokens=10))
+
+    create_client(limiter).call(create, 10)
+
+    assert len(calls) == 3
+    assert clock.sleeps == pytest.approx([1.0, 2.0])
+    assert limiter.paused_until == pytest.approx(clock.now)
+
+def test_call_refunds_tokens_of_failed_attempts(clock):
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=600)
+    create, _ = failing_create([rate_limit_error({'retry-after': '0'}) for _ in range(3)], FakeResponse(total_tokens=500))
+
+    create_client(limiter).call(create, 500)
+
+    assert clock.sleeps == []
+    assert limiter.tokens.available == pytest.approx(100)
+
+def test_call_reraises_after_max_retries(clock):
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=100000)
+    create, calls = failing_create([rate_limit_error({'retry-after': '0'}) for _ in range(3)])
+
+    with pytest.raises(RateLimitError):
+        create_client(limiter, max_retries=2).call(create, 10)
+
+    assert len(calls) == 3
+
+def test_call_does_not_retry_other_errors(clock):
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=100000)
+    error = BadRequestError('Bad request', response=httpx.Response(400, request=REQUEST), body=None)
+    create, calls = failing_create([error])
+
+    with pytest.raises(BadRequestError):
+        create_client(limiter).call(create, 10)
+
+    assert len(calls) == 1
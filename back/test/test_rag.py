@@ -0,0 +1,58 @@
+from collections import namedtuple
+import pytest
+import rag
+from data.storage import RetrievedChunk
+from rag import RAGProcessor
+
+WindowRow = namedtuple('WindowRow', ['window_index', 'chunk_index', 'chunk_text'])
+
+STORED_CHUNKS = {
+    ('a.txt', index): f'a{index} a{index + 1}' for index in range(10)
+} | {
+    ('b.txt', index): f'b{index} b{index + 1}' for index in range(10)
+}
+
+class FakeSession:
+    def close(self):
+        pass
+
+@pytest.fixture
+def window_queries(monkeypatch):
+    queries = []
+
+    def fetch_chunk_windows(db, windows):
+        queries.append(windows)
+        return [
+            WindowRow(window_index, chunk_index, STORED_CHUNKS[(window['filename'], chunk_index)])
+            for window_index, window in enumerate(windows, 1)
+            for chunk_index in range(window['start_index'], window['end_index'] + 1)
+            if (window['filename'], chunk_index) in STORED_CHUNKS
+        ]
+
+    monkeypatch.setattr(rag, 'SessionLocal', FakeSession)
+    monkeypatch.setattr(rag, 'fetch_chunk_windows', fetch_chunk_windows)
+    return queries
+
+def test_expand_neighbors_batch_fetches_all_windows_in_one_query(window_queries):
+    processor = RAGProcessor(llm=None, template_manager=None)
+    chunks_batch = [
+        [RetrievedChunk('a.txt', 4, 'a4 a5', 0.1), RetrievedChunk('a.txt', 6, 'a6 a7', 0.05)],
+        [],
+        [RetrievedChunk('b.txt', 0, 'b0 b1', 0.2)],
+    ]
+
+    expanded = processor.expand_neighbors_batch(chunks_batch, neighbors=1)
+
+    assert len(window_queries) == 1
+    assert expanded == [
+        [RetrievedChunk('a.txt', 6, 'a3 a4 a5 a6 a7 a8', 0.05)],
+        [],
+        [RetrievedChunk('b.txt', 0, 'b0 b1 b2', 0.2)],
+    ]
+
+def test_expand_neighbors_is_noop_without_neighbors(window_queries):
+    processor = RAGProcessor(llm=None, template_manager=None)
+    chunks = [RetrievedChunk('a.txt', 4, 'a4 a5', 0.1)]
+
+    assert processor.expand_neighbors(chunks, neighbors=0) == chunks
+    assert window_queries == []
@@ -0,0 +1,28 @@
+import os
+from collections import namedtuple
+from template_manager import TemplateManager, RAG_PROMPT_PREFIX_TEMPLATE
+
+Chunk = namedtuple('Chunk', ['chunk_text'])
+
+CLOSING_INSTRUCTION = "Answer with scholarly wisdom"
+
+def test_renders_templates_outside_back_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    prompt = TemplateManager().render_rag_prompt("What is virtue?", [Chunk("Virtue is a habit.")])
+
+    assert prompt.index("Virtue is a habit.") < prompt.index(CLOSING_INSTRUCTION) < prompt.index("Question: What is virtue?")
+
+def test_static_prefix_is_rendered_once_until_template_changes(tmp_path):
+    prefix_path = tmp_path / RAG_PROMPT_PREFIX_TEMPLATE
+    prefix_path.write_text("First prefix")
+    manager = TemplateManager(tmp_path, auto_reload=True)
+
+    first = manager.render_static(RAG_PROMPT_PREFIX_TEMPLATE)
+    assert manager.render_static(RAG_PROMPT_PREFIX_TEMPLATE) is first
+
+    modified = prefix_path.stat().st_mtime + 10
+    prefix_path.write_text("Second prefix")
+    os.utime(prefix_path, (modified, modified))
+
+    assert manager.render_static(RAG_PROMPT_PREFIX_TEMPLATE) == "Second prefix"
@@ -0,0 +1,118 @@
+import contextlib
+import json
+import numpy as np
+import pytest
+from data import vector_index
+from data.storage import EMBEDDING_DIMENSIONS
+from data.vector_index import NumpyVectorIndex, normalize_rows
+
+SNAPSHOT_ROWS = 50
+DELTA_ROWS = 7
+
+def random_embeddings(generator, count: int) -> np.ndarray:
+    return normalize_rows(generator.standard_normal((count, EMBEDDING_DIMENSIONS)).astype(np.float32))
+
+def write_snapshot(base_path, matrix: np.ndarray, ids: list, version: str = 'v1'):
+    matrix_path = base_path.with_suffix(f'.{version}.npy')
+    np.save(matrix_path, matrix)
+    base_path.with_suffix('.json').write_text(json.dumps({
+        'matrix': matrix_path.name,
+        'rows': len(ids),
+        'max_id': max(ids, default=0),
+        'ids': ids,
+        'filenames': [f'file{chunk_id}.txt' for chunk_id in ids],
+        'chunk_indexes': list(range(len(ids))),
+    }))
+
+class FakeEngine:
+    def connect(self):
+        return contextlib.nullcontext()
+
+class FakeRows:
+    def __init__(self, rows: list):
+        self.rows = rows
+
+    def fetchall(self) -> list:
+        return self.rows
+
+def embedding_rows(ids: list, embeddings: np.ndarray) -> list:
+    return [
+        (chunk_id, f'file{chunk_id}.txt', 0, json.dumps(embedding.tolist()))
+        for chunk_id, embedding in zip(ids, embeddings)
+    ]
+
+@pytest.fixture
+def generator():
+    return np.random.default_rng(7)
+
+@pytest.fixture
+def index(tmp_path, generator, monkeypatch):
+    monkeypatch.setattr(vector_index, 'engine', FakeEngine())
+    monkeypatch.setattr(vector_index, 'SEARCH_BLOCK_ROWS', 8)
+    base_path = tmp_path / 'vector_index'
+    write_snapshot(base_path, random_embeddings(generator, SNAPSHOT_ROWS), list(range(1, SNAPSHOT_ROWS + 1)))
+    return NumpyVectorIndex(str(base_path), refresh_seconds=0)
+
+@pytest.mark.parametrize('limit', [1, 5, 50, 100])
+def test_top_k_matches_full_sort_across_blocks_and_delta(index, generator, limit):
+    index.delta = random_embeddings(generator, DELTA_ROWS)
+    queries = random_embeddings(generator, 3)
+
+    scores, rows = index.top_k(queries, limit)
+
+    all_scores = queries @ np.vstack([index.snapshot, index.delta]).T
+    expected_rows = np.argsort(-all_scores, axis=1)[:, :limit]
+    assert np.array_equal(rows, expected_rows)
+    assert np.allclose(scores, np.take_along_axis(all_scores, expected_rows, axis=1))
+
+def test_top_k_on_empty_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, 'engine', FakeEngine())
+    base_path = tmp_path / 'vector_index'
+    write_snapshot(base_path, np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32), [])
+    index = NumpyVectorIndex(str(base_path))
+
+    scores, rows = index.top_k(np.ones((2, EMBEDDING_DIMENSIONS), dtype=np.float32), 5)
+
+    assert scores.shape == (2, 0)
+    assert rows.shape == (2, 0)
+
+def test_refresh_appends_new_rows_to_delta(index, generator, monkeypatch):
+    new_ids = [SNAPSHOT_ROWS + 1, SNAPSHOT_ROWS + 2]
+    new_embeddings = random_embeddings(generator, len(new_ids))
+    monkeypatch.setattr(vector_index, 'fetch_table_stats', lambda connection: (SNAPSHOT_ROWS + 2, SNAPSHOT_ROWS + 2))
+    monkeypatch.setattr(vector_index, 'fetch_rows_after', lambda connection, min_id, max_id: FakeRows(embedding_rows(new_ids, new_embeddings)))
+
+    assert index.refresh()
+
+    assert index.ids[-2:] == new_ids
+    assert index.max_id == SNAPSHOT_ROWS + 2
+    assert np.allclose(index.delta, new_embeddings, atol=1e-6)
+
+def test_refresh_requests_rebuild_after_delete(index, monkeypatch):
+    monkeypatch.setattr(vector_index, 'fetch_table_stats', lambda connection: (SNAPSHOT_ROWS - 1, SNAPSHOT_ROWS))
+    monkeypatch.setattr(vector_index, 'fetch_rows_after', lambda connection, min_id, max_id: FakeRows([]))
+
+    assert not index.refresh()
+
+def test_search_rebuilds_outside_lock(index, generator, tmp_path, monkeypatch):
+    remaining_ids = list(range(2, SNAPSHOT_ROWS + 1))
+    remaining_embeddings = random_embeddings(generator, len(remaining_ids))
+    rebuild_lock_states = []
+
+    def write_rebuilt_snapshot(path):
+        rebuild_lock_states.append(index.lock.locked())
+        write_snapshot(tmp_path / 'vector_index', remaining_embeddings, remaining_ids, version='v2')
+        return len(remaining_ids)
+
+    monkeypatch.setattr(vector_index, 'fetch_table_stats', lambda connection: (len(remaining_ids), SNAPSHOT_ROWS))
+    monkeypatch.setattr(vector_index, 'fetch_rows_after', lambda connection, min_id, max_id: FakeRows([]))
+    monkeypatch.setattr(vector_index, 'write_vector_index_snapshot', write_rebuilt_snapshot)
+    monkeypatch.setattr(index, 'fetch_chunk_texts', lambda ids: {chunk_id: f'text {chunk_id}' for chunk_id in ids})
+
+    results = index.search(remaining_embeddings[0].tolist(), 3)
+
+    assert rebuild_lock_states == [False]
+    assert not index.rebuilding
+    assert index.ids == remaining_ids
+    assert results[0].filename == 'file2.txt'
+    assert results[0].distance == pytest.approx(0, abs=1e-5)